@@ -0,0 +1,44 @@
+import numpy as np
+from kernels import fill_indicators
+
+class IndicatorEngine:
+    def __init__(self, max_bars, tenkan_period=9, kijun_period=26, senkou_b_period=52,
+                 fast_period=10, slow_period=50, long_period=200):
+        """
+        Initialize the indicator engine
+        max_bars: largest number of bars run() will be called with
+        Output and scratch buffers are allocated once here and reused by every run(),
+        so sweeping many symbols allocates nothing per symbol
+        """
+        self.max_bars = max_bars
+        self.periods = (tenkan_period, kijun_period, senkou_b_period, fast_period, slow_period, long_period)
+        
+        self.buf = np.empty((7, max_bars), dtype=np.float64)
+        self._max_q = np.empty((3, max_bars), dtype=np.int64)
+        self._min_q = np.empty((3, max_bars), dtype=np.int64)
+        self._csum = np.empty(max_bars + 1, dtype=np.float64)
+    
+    def run(self, high, low, close):
+        """
+        Calculate Ichimoku lines and SMAs for one symbol
+        Returns views into the engine buffers, overwritten by the next run()
+        """
+        size = len(close)
+        if size > self.max_bars:
+            raise ValueError(f'{size} bars exceeds engine capacity of {self.max_bars}')
+        
+        out = self.buf[:, :size]
+        fill_indicators(
+            high, low, close, *self.periods, out,
+            self._max_q[:, :size], self._min_q[:, :size], self._csum[:size + 1]
+        )
+        
+        return {
+            'tenkan': out[0],
+            'kijun': out[1],
+            'senkou_span_a': out[2],
+            'senkou_span_b': out[3],
+            'ma_fast': out[4],
+            'ma_slow': out[5],
+            'ma_long': out[6]
+        }
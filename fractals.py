@@ -1,5 +1,6 @@
 import pandas as pd
 import numpy as np
+from kernels import fractals, last_true
 
 class WilliamsFractals:
     def __init__(self, df, period=2):
@@ -9,28 +10,38 @@ class WilliamsFractals:
         """
         self.df = df
         self.period = period
+        
+        # Raw price arrays, read once and reused by calculate()
+        self._high = np.ascontiguousarray(df['high'], dtype=np.float64)
+        self._low = np.ascontiguousarray(df['low'], dtype=np.float64)
+        
         self.calculate()
     
     def calculate(self):
-        """Calculate Williams Fractals using a vectorized approach"""
-        n = self.period
-        window_size = 2 * n + 1
-
-        # High Fractals (Bearish)
-        self.df['fractal_up'] = self.df['high'].rolling(window=window_size, center=True).max()
-        self.df['fractal_up'] = np.where(self.df['high'] == self.df['fractal_up'], self.df['high'], np.nan)
+        """Calculate Williams Fractals in a single pass over high/low"""
+        # Boolean masks of fractal bars; prices come from the high/low arrays
+        self._is_up, self._is_down = fractals(self._high, self._low, self.period)
+        self._is_fractal = self._is_up | self._is_down
         
-        # Down Fractals (Bullish)
-        self.df['fractal_down'] = self.df['low'].rolling(window=window_size, center=True).min()
-        self.df['fractal_down'] = np.where(self.df['low'] == self.df['fractal_down'], self.df['low'], np.nan)
+        # Get recent fractals for analysis
+        up = self._high[last_true(self._is_up, 5)]
+        down = self._low[last_true(self._is_down, 5)]
+        self.recent_up_fractals = up.tolist()
+        self.recent_down_fractals = down.tolist()
         
         # Get last fractals for support/resistance
-        self.last_up_fractal = self.df['fractal_up'].dropna().iloc[-1] if not self.df['fractal_up'].dropna().empty else None
-        self.last_down_fractal = self.df['fractal_down'].dropna().iloc[-1] if not self.df['fractal_down'].dropna().empty else None
-        
-        # Get recent fractals for analysis
-        self.recent_up_fractals = self.df['fractal_up'].dropna().tail(5).tolist()
-        self.recent_down_fractals = self.df['fractal_down'].dropna().tail(5).tolist()
+        self.last_up_fractal = up[-1] if up.size else None
+        self.last_down_fractal = down[-1] if down.size else None
+    
+    @property
+    def fractal_up(self):
+        """High at each up fractal bar, NaN elsewhere"""
+        return pd.Series(np.where(self._is_up, self._high, np.nan), index=self.df.index)
+    
+    @property
+    def fractal_down(self):
+        """Low at each down fractal bar, NaN elsewhere"""
+        return pd.Series(np.where(self._is_down, self._low, np.nan), index=self.df.index)
     
     def get_current_values(self):
         """Get current fractal values"""
@@ -100,21 +111,12 @@ class WilliamsFractals:
             }
         
         # 4. Recent fractal sequence and dominance (last 10 actual fractals)
-        recent_fractals = []
-        fractal_up = self.df['fractal_up']
-        fractal_down = self.df['fractal_down']
-        # Go backwards through the DataFrame and collect the last 10 actual fractals
-        for i in range(1, len(self.df)):
-            idx = -i
-            if not np.isnan(fractal_up.iloc[idx]):
-                recent_fractals.append('up')
-            elif not np.isnan(fractal_down.iloc[idx]):
-                recent_fractals.append('down')
-            if len(recent_fractals) == 10:
-                break
+        # Positions of the last 10 fractal bars (the first bar is never scanned), most recent first
+        positions = last_true(self._is_fractal[1:], 10)[::-1] + 1
+        # A bar that is both an up and a down fractal counts as 'up'
+        recent_fractals = np.where(self._is_up[positions], 'up', 'down').tolist()
         # If less than 10, pad with 'none'
-        while len(recent_fractals) < 10:
-            recent_fractals.append('none')
+        recent_fractals += ['none'] * (10 - len(recent_fractals))
         # Count dominance
         up_count = recent_fractals.count('up')
         down_count = recent_fractals.count('down')
@@ -1,44 +1,91 @@
 import pandas as pd
+import numpy as np
+from kernels import ichimoku
 
 class Ichimoku:
-    def __init__(self, df, tenkan_period=9, kijun_period=26, senkou_b_period=52, displacement=26):
+    def __init__(self, df, tenkan_period=9, kijun_period=26, senkou_b_period=52, displacement=26, lines=None):
+        """
+        Initialize Ichimoku
+        lines: optional precomputed (tenkan, kijun, span_a, span_b) arrays, e.g. from IndicatorEngine.run
+        """
         self.df = df
         self.tenkan_period = tenkan_period
         self.kijun_period = kijun_period
         self.senkou_b_period = senkou_b_period
         self.displacement = displacement
         
-        # Calculate all components
-        self.calculate()
-    
-    def calculate(self):
-        # Calculate Tenkan-sen
-        high_tenkan = self.df['high'].rolling(window=self.tenkan_period).max()
-        low_tenkan = self.df['low'].rolling(window=self.tenkan_period).min()
-        self.tenkan = (high_tenkan + low_tenkan) / 2
-        
-        # Calculate Kijun-sen
-        high_kijun = self.df['high'].rolling(window=self.kijun_period).max()
-        low_kijun = self.df['low'].rolling(window=self.kijun_period).min()
-        self.kijun = (high_kijun + low_kijun) / 2
-        
-        # Calculate Senkou Span A
-        self.senkou_span_a = (self.tenkan + self.kijun) / 2
+        # Raw price arrays, read once and reused by calculate()
+        self._high = np.ascontiguousarray(df['high'], dtype=np.float64)
+        self._low = np.ascontiguousarray(df['low'], dtype=np.float64)
         
-        # Calculate Senkou Span B
-        high_span_b = self.df['high'].rolling(window=self.senkou_b_period).max()
-        low_span_b = self.df['low'].rolling(window=self.senkou_b_period).min()
-        self.senkou_span_b = (high_span_b + low_span_b) / 2
+        # Full lines are calculated on first use; analyze() only needs a few window extrema
+        self._tenkan = None
+        if lines is not None:
+            self.calculate(lines)
+    
+    def calculate(self, lines=None):
+        # Tenkan-sen, Kijun-sen and Senkou Span B share one pass over high/low
+        if lines is None:
+            tenkan, kijun, span_b = ichimoku(self._high, self._low, self.tenkan_period, self.kijun_period, self.senkou_b_period)
+            
+            # Calculate Senkou Span A
+            lines = (tenkan, kijun, (tenkan + kijun) / 2, span_b)
+        self._tenkan, self._kijun, self._span_a, self._span_b = lines
+    
+    def _line(self, name):
+        """Return a calculated line as a Series, calculating all lines on first use"""
+        if self._tenkan is None:
+            self.calculate()
+        return pd.Series(getattr(self, name), index=self.df.index)
+    
+    @property
+    def tenkan(self):
+        return self._line('_tenkan')
+    
+    @property
+    def kijun(self):
+        return self._line('_kijun')
+    
+    @property
+    def senkou_span_a(self):
+        return self._line('_span_a')
+    
+    @property
+    def senkou_span_b(self):
+        return self._line('_span_b')
+    
+    def _midpoint(self, end, period):
+        """Midpoint of the highest high and lowest low over the period bars ending at index end"""
+        if end < period - 1:
+            return np.nan
+        start = end - period + 1
+        return (self._high[start:end + 1].max() + self._low[start:end + 1].min()) / 2
     
     def get_current_values(self):
         """Get current Ichimoku values"""
+        if self._tenkan is not None:
+            return {
+                'tenkan': self._tenkan[-1],
+                'kijun': self._kijun[-1],
+                'current_span_a': self._span_a[-self.displacement] if len(self._span_a) > self.displacement else None,
+                'current_span_b': self._span_b[-self.displacement] if len(self._span_b) > self.displacement else None,
+                'future_span_a': self._span_a[-1],
+                'future_span_b': self._span_b[-1]
+            }
+        
+        # Only the last bar and the displaced bar are needed, so evaluate just those windows
+        last = len(self._high) - 1
+        current = len(self._high) - self.displacement
+        tenkan = self._midpoint(last, self.tenkan_period)
+        kijun = self._midpoint(last, self.kijun_period)
+        has_current = len(self._high) > self.displacement
         return {
-            'tenkan': self.tenkan.iloc[-1],
-            'kijun': self.kijun.iloc[-1],
-            'current_span_a': self.senkou_span_a.iloc[-self.displacement] if len(self.senkou_span_a) > self.displacement else None,
-            'current_span_b': self.senkou_span_b.iloc[-self.displacement] if len(self.senkou_span_b) > self.displacement else None,
-            'future_span_a': self.senkou_span_a.iloc[-1],
-            'future_span_b': self.senkou_span_b.iloc[-1]
+            'tenkan': tenkan,
+            'kijun': kijun,
+            'current_span_a': (self._midpoint(current, self.tenkan_period) + self._midpoint(current, self.kijun_period)) / 2 if has_current else None,
+            'current_span_b': self._midpoint(current, self.senkou_b_period) if has_current else None,
+            'future_span_a': (tenkan + kijun) / 2,
+            'future_span_b': self._midpoint(last, self.senkou_b_period)
         }
     
     def analyze(self, current_price):
@@ -0,0 +1,23 @@
+"""
+Numeric kernels shared by the indicators
+
+Picks the fastest available implementation once at import:
+1. the ta_kernels extension built by kernels_aot.py (no numba import needed)
+2. the numba JIT versions in kernels_jit.py
+3. the vectorized pandas versions in kernels_pandas.py
+"""
+
+try:
+    from ta_kernels import (
+        fractals, ichimoku, fill_indicators, sma3, ema3, last_true, wilder_rsi, wilder_rsi_2d
+    )
+    # True when the kernels run as native code (numba JIT or the AOT build)
+    COMPILED = True
+except ImportError:
+    from kernels_jit import (
+        COMPILED, fractals, ichimoku, fill_indicators, sma3, ema3, last_true, wilder_rsi, wilder_rsi_2d
+    )
+
+    # Without numba the JIT loops would run as plain Python, so use the vectorized pandas versions
+    if not COMPILED:
+        from kernels_pandas import fractals, ichimoku, fill_indicators, sma3, ema3, last_true
@@ -0,0 +1,32 @@
+"""
+Ahead-of-time build of the numeric kernels
+
+Run once with `python kernels_aot.py` to produce the `ta_kernels` extension
+module next to this file. kernels.py picks it up when present, so `main.py`
+no longer imports numba or pays the JIT compilation cost on every start.
+"""
+import os
+
+from numba.pycc import CC
+
+import kernels_jit
+
+cc = CC('ta_kernels')
+cc.output_dir = os.path.dirname(os.path.abspath(__file__))
+
+SIGNATURES = {
+    'fractals': 'UniTuple(b1[:], 2)(f8[:], f8[:], i8)',
+    'ichimoku': 'UniTuple(f8[:], 3)(f8[:], f8[:], i8, i8, i8)',
+    'fill_indicators': 'none(f8[:], f8[:], f8[:], i8, i8, i8, i8, i8, i8, f8[:, :], i8[:, :], i8[:, :], f8[:])',
+    'sma3': 'UniTuple(f8[:], 3)(f8[:], i8, i8, i8)',
+    'ema3': 'UniTuple(f8[:], 3)(f8[:], f8, f8, f8)',
+    'last_true': 'i8[:](b1[:], i8)',
+    'wilder_rsi': 'Tuple((f8[:], f8, f8))(f8[:], i8)',
+    'wilder_rsi_2d': 'f8[:, :](f8[:, :], i8)',
+}
+
+for name, signature in SIGNATURES.items():
+    cc.export(name, signature)(getattr(kernels_jit, name).py_func)
+
+if __name__ == "__main__":
+    cc.compile()
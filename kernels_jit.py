@@ -0,0 +1,339 @@
+"""
+Numba versions of the numeric kernels
+
+Import them through kernels.py, which prefers the ta_kernels AOT build and
+only loads this module (and numba) when that build is missing.
+"""
+import numpy as np
+
+# True when numba is available and the kernels below are JIT-compiled
+COMPILED = True
+
+try:
+    from numba import njit, prange
+except ImportError:  # numba is optional, kernels then run as plain Python
+    COMPILED = False
+    prange = range
+
+    def njit(*args, **kwargs):
+        if args and callable(args[0]):
+            return args[0]
+        return lambda func: func
+
+
+@njit(cache=True)
+def fractals(high, low, n):
+    """
+    Williams Fractals in a single pass using monotonic deques
+    Returns (is_up, is_down): boolean masks marking the up/down fractal bars
+    As with rolling(), a window holding a NaN has no fractal; NaN bars are kept out of the deques
+    """
+    size = high.shape[0]
+    window = 2 * n + 1
+    is_up = np.zeros(size, dtype=np.bool_)
+    is_down = np.zeros(size, dtype=np.bool_)
+
+    # Index deques; head of max_q holds the window high, head of min_q the window low
+    max_q = np.empty(size, dtype=np.int64)
+    min_q = np.empty(size, dtype=np.int64)
+    max_head = max_tail = 0
+    min_head = min_tail = 0
+    # One past the most recent NaN high/low; a window starting before it still holds the NaN
+    high_valid = low_valid = 0
+
+    for i in range(size):
+        if high[i] != high[i]:
+            high_valid = i + 1
+        else:
+            while max_tail > max_head and high[max_q[max_tail - 1]] <= high[i]:
+                max_tail -= 1
+            max_q[max_tail] = i
+            max_tail += 1
+        if max_tail > max_head and max_q[max_head] <= i - window:
+            max_head += 1
+
+        if low[i] != low[i]:
+            low_valid = i + 1
+        else:
+            while min_tail > min_head and low[min_q[min_tail - 1]] >= low[i]:
+                min_tail -= 1
+            min_q[min_tail] = i
+            min_tail += 1
+        if min_tail > min_head and min_q[min_head] <= i - window:
+            min_head += 1
+
+        # Window [i - 2n, i] is complete, its center bar is a fractal if it holds the extreme
+        if i >= window - 1:
+            c = i - n
+            start = i - window + 1
+            is_up[c] = high_valid <= start and high[max_q[max_head]] == high[c]
+            is_down[c] = low_valid <= start and low[min_q[min_head]] == low[c]
+
+    return is_up, is_down
+
+
+@njit(cache=True)
+def _push_window(high, low, i, period, max_q, min_q, ptr):
+    """
+    Push bar i into one pair of monotonic deques covering the last `period` bars
+    ptr holds (max_head, max_tail, min_head, min_tail, high_valid, low_valid), the last two
+    one past the most recent NaN high/low; returns the window midpoint, NaN while it holds a NaN
+    """
+    if high[i] != high[i]:
+        ptr[4] = i + 1
+    else:
+        while ptr[1] > ptr[0] and high[max_q[ptr[1] - 1]] <= high[i]:
+            ptr[1] -= 1
+        max_q[ptr[1]] = i
+        ptr[1] += 1
+    if ptr[1] > ptr[0] and max_q[ptr[0]] <= i - period:
+        ptr[0] += 1
+
+    if low[i] != low[i]:
+        ptr[5] = i + 1
+    else:
+        while ptr[3] > ptr[2] and low[min_q[ptr[3] - 1]] >= low[i]:
+            ptr[3] -= 1
+        min_q[ptr[3]] = i
+        ptr[3] += 1
+    if ptr[3] > ptr[2] and min_q[ptr[2]] <= i - period:
+        ptr[2] += 1
+
+    start = i - period + 1
+    if ptr[4] > start or ptr[5] > start:
+        return np.nan
+    return (high[max_q[ptr[0]]] + low[min_q[ptr[2]]]) * 0.5
+
+
+@njit(cache=True)
+def ichimoku(high, low, tenkan_period, kijun_period, senkou_b_period):
+    """
+    Tenkan, Kijun and Senkou Span B midpoints in a single pass over high/low
+    Keeps one pair of monotonic deques per period; NaN until a window is full
+    """
+    size = high.shape[0]
+    periods = np.array([tenkan_period, kijun_period, senkou_b_period], dtype=np.int64)
+    lines = np.full((3, size), np.nan)
+
+    max_q = np.empty((3, size), dtype=np.int64)
+    min_q = np.empty((3, size), dtype=np.int64)
+    ptr = np.zeros((3, 6), dtype=np.int64)
+
+    for i in range(size):
+        for j in range(3):
+            mid = _push_window(high, low, i, periods[j], max_q[j], min_q[j], ptr[j])
+            if i >= periods[j] - 1:
+                lines[j, i] = mid
+
+    return lines[0], lines[1], lines[2]
+
+
+@njit(cache=True)
+def fill_indicators(high, low, close, tenkan_period, kijun_period, senkou_b_period,
+                    fast_period, slow_period, long_period, out, max_q, min_q, csum):
+    """
+    Ichimoku lines and three SMAs in one streaming pass, written into caller-owned buffers
+    out: (7, N) rows tenkan, kijun, span_a, span_b, ma_fast, ma_slow, ma_long
+    max_q, min_q: (3, N) int64 deque scratch; csum: (N + 1) prefix-sum scratch
+    """
+    size = high.shape[0]
+    periods = np.array([tenkan_period, kijun_period, senkou_b_period], dtype=np.int64)
+    windows = np.array([fast_period, slow_period, long_period], dtype=np.int64)
+    ptr = np.zeros((3, 6), dtype=np.int64)
+    out[:, :] = np.nan
+    csum[0] = 0.0
+    # One past the most recent NaN close
+    close_valid = 0
+
+    for i in range(size):
+        # Ichimoku midpoints: rows 0, 1 and 3 (Span A in row 2 is derived from 0 and 1)
+        for j in range(3):
+            mid = _push_window(high, low, i, periods[j], max_q[j], min_q[j], ptr[j])
+            if i >= periods[j] - 1:
+                out[j if j < 2 else 3, i] = mid
+        out[2, i] = (out[0, i] + out[1, i]) / 2
+
+        # Simple moving averages from the running prefix sum: rows 4-6
+        # NaN closes add nothing to the sum, and a window starting before the last one stays NaN
+        x = close[i]
+        if x != x:
+            close_valid = i + 1
+            csum[i + 1] = csum[i]
+        else:
+            csum[i + 1] = csum[i] + x
+        for j in range(3):
+            w = windows[j]
+            if i >= w - 1 and close_valid <= i + 1 - w:
+                out[4 + j, i] = (csum[i + 1] - csum[i + 1 - w]) / w
+
+
+@njit(cache=True)
+def sma3(close, w1, w2, w3):
+    """
+    Three simple moving averages from one shared prefix sum, NaN until each window is full
+    As with rolling().mean(), a window holding a NaN close is NaN; a NaN-count prefix tracks that
+    """
+    size = close.shape[0]
+    csum = np.empty(size + 1)
+    cnan = np.empty(size + 1, dtype=np.int64)
+    csum[0] = 0.0
+    cnan[0] = 0
+    for i in range(size):
+        x = close[i]
+        if x != x:
+            csum[i + 1] = csum[i]
+            cnan[i + 1] = cnan[i] + 1
+        else:
+            csum[i + 1] = csum[i] + x
+            cnan[i + 1] = cnan[i]
+
+    ma1 = np.full(size, np.nan)
+    ma2 = np.full(size, np.nan)
+    ma3 = np.full(size, np.nan)
+    for i in range(w1 - 1, size):
+        if cnan[i + 1] == cnan[i + 1 - w1]:
+            ma1[i] = (csum[i + 1] - csum[i + 1 - w1]) / w1
+    for i in range(w2 - 1, size):
+        if cnan[i + 1] == cnan[i + 1 - w2]:
+            ma2[i] = (csum[i + 1] - csum[i + 1 - w2]) / w2
+    for i in range(w3 - 1, size):
+        if cnan[i + 1] == cnan[i + 1 - w3]:
+            ma3[i] = (csum[i + 1] - csum[i + 1 - w3]) / w3
+    return ma1, ma2, ma3
+
+
+@njit(cache=True)
+def _ewm_resume(y, x, alpha, decay, gap):
+    """
+    One adjust=False EWM step after `gap` NaN bars, weighted as pandas ewm(ignore_na=False) does:
+    the previous average decays once per bar since it was observed
+    """
+    d = decay ** (gap + 1)
+    # pandas weights the new value by 1 - d instead of alpha when alpha is exactly 0.5 (com == 1)
+    w = 1.0 - d if alpha == 0.5 else alpha
+    return (d * y + w * x) / (d + w)
+
+
+@njit(cache=True, fastmath={'contract'})
+def ema3(close, a1, a2, a3):
+    """
+    Three exponential moving averages (adjust=False) in one pass over close
+    The recurrences are interleaved to hide their latency, and 'contract' lets each step fuse into an FMA
+    NaN closes are weighted like ewm(ignore_na=False): the average carries over and decays across the gap
+    """
+    size = close.shape[0]
+    ma1 = np.empty(size)
+    ma2 = np.empty(size)
+    ma3 = np.empty(size)
+    if size == 0:
+        return ma1, ma2, ma3
+
+    b1 = 1.0 - a1
+    b2 = 1.0 - a2
+    b3 = 1.0 - a3
+    y1 = y2 = y3 = close[0]
+    ma1[0] = ma2[0] = ma3[0] = y1
+    # NaN closes since the last observation
+    gap = 0
+    for i in range(1, size):
+        x = close[i]
+        if x != x:
+            gap += 1
+        elif y1 != y1:
+            # First observation after leading NaNs
+            y1 = y2 = y3 = x
+            gap = 0
+        elif gap == 0:
+            y1 = a1 * x + b1 * y1
+            y2 = a2 * x + b2 * y2
+            y3 = a3 * x + b3 * y3
+        else:
+            y1 = _ewm_resume(y1, x, a1, b1, gap)
+            y2 = _ewm_resume(y2, x, a2, b2, gap)
+            y3 = _ewm_resume(y3, x, a3, b3, gap)
+            gap = 0
+        ma1[i] = y1
+        ma2[i] = y2
+        ma3[i] = y3
+    return ma1, ma2, ma3
+
+
+@njit(cache=True)
+def last_true(mask, k):
+    """Positions of the last k True entries of mask in ascending order, scanning backwards and stopping early"""
+    out = np.empty(k, dtype=np.int64)
+    found = 0
+    i = mask.shape[0] - 1
+    while i >= 0 and found < k:
+        if mask[i]:
+            found += 1
+            out[k - found] = i
+        i -= 1
+    return out[k - found:]
+
+
+@njit(cache=True, fastmath={'contract'})
+def wilder_rsi(close, length):
+    """
+    RSI with Wilder's smoothing in a single pass over close
+    Fuses the price change, gain/loss split and both smoothing recurrences; the first value is NaN
+    Returns (rsi, avg_gain, avg_loss) with the final averages, so the series can be continued
+    """
+    size = close.shape[0]
+    out = np.empty(size)
+    if size == 0:
+        return out, 0.0, 0.0
+
+    alpha = 1.0 / length
+    decay = 1.0 - alpha
+    avg_gain = 0.0
+    avg_loss = 0.0
+    out[0] = np.nan
+    for i in range(1, size):
+        d = close[i] - close[i - 1]
+        gain = d if d > 0.0 else 0.0
+        loss = -d if d < 0.0 else 0.0
+        avg_gain = decay * avg_gain + alpha * gain
+        avg_loss = decay * avg_loss + alpha * loss
+        if avg_loss == 0.0:
+            # No losses yet: RSI is 100 after any gain, undefined on a flat series
+            out[i] = 100.0 if avg_gain > 0.0 else np.nan
+        else:
+            out[i] = 100.0 - 100.0 / (1.0 + avg_gain / avg_loss)
+    return out, avg_gain, avg_loss
+
+
+@njit(cache=True, parallel=True, fastmath={'contract'})
+def wilder_rsi_2d(close, length):
+    """
+    wilder_rsi for many symbols at once over a C-ordered (time, symbol) array
+    Blocks of symbols run in parallel; within a block the symbol axis is the inner, contiguous loop
+    """
+    n, m = close.shape
+    out = np.empty((n, m))
+    if n == 0:
+        return out
+
+    alpha = 1.0 / length
+    decay = 1.0 - alpha
+    block = 64
+    for b in prange((m + block - 1) // block):
+        lo = b * block
+        hi = min(lo + block, m)
+        avg_gain = np.zeros(hi - lo)
+        avg_loss = np.zeros(hi - lo)
+        out[0, lo:hi] = np.nan
+        for i in range(1, n):
+            for j in range(lo, hi):
+                d = close[i, j] - close[i - 1, j]
+                gain = d if d > 0.0 else 0.0
+                loss = -d if d < 0.0 else 0.0
+                g = decay * avg_gain[j - lo] + alpha * gain
+                l = decay * avg_loss[j - lo] + alpha * loss
+                avg_gain[j - lo] = g
+                avg_loss[j - lo] = l
+                if l == 0.0:
+                    out[i, j] = 100.0 if g > 0.0 else np.nan
+                else:
+                    out[i, j] = 100.0 - 100.0 / (1.0 + g / l)
+    return out
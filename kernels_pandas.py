@@ -0,0 +1,62 @@
+"""
+Vectorized pandas versions of the kernels, with the same signatures
+
+kernels.py uses these when neither numba nor the ta_kernels AOT build is
+available, since the loop kernels would otherwise run as plain Python.
+"""
+import numpy as np
+import pandas as pd
+
+
+def _midpoint(high, low, period):
+    """(highest high + lowest low) / 2 over the last `period` bars"""
+    return ((high.rolling(window=period).max() + low.rolling(window=period).min()) / 2).to_numpy()
+
+
+def fractals(high, low, n):
+    """Williams Fractals as boolean masks (is_up, is_down) from centered rolling extremes"""
+    window = 2 * n + 1
+    high = pd.Series(high)
+    low = pd.Series(low)
+    is_up = (high.rolling(window=window, center=True).max() == high).to_numpy()
+    is_down = (low.rolling(window=window, center=True).min() == low).to_numpy()
+    return is_up, is_down
+
+
+def ichimoku(high, low, tenkan_period, kijun_period, senkou_b_period):
+    """Tenkan, Kijun and Senkou Span B midpoints; NaN until a window is full"""
+    high = pd.Series(high)
+    low = pd.Series(low)
+    return (
+        _midpoint(high, low, tenkan_period),
+        _midpoint(high, low, kijun_period),
+        _midpoint(high, low, senkou_b_period),
+    )
+
+
+def fill_indicators(high, low, close, tenkan_period, kijun_period, senkou_b_period,
+                    fast_period, slow_period, long_period, out, max_q, min_q, csum):
+    """
+    Ichimoku lines and three SMAs written into out (7, N), rows as in kernels.fill_indicators
+    The scratch buffers are not needed here
+    """
+    out[0], out[1], out[3] = ichimoku(high, low, tenkan_period, kijun_period, senkou_b_period)
+    out[2] = (out[0] + out[1]) / 2
+    out[4], out[5], out[6] = sma3(close, fast_period, slow_period, long_period)
+
+
+def sma3(close, w1, w2, w3):
+    """Three simple moving averages, NaN until each window is full"""
+    close = pd.Series(close)
+    return tuple(close.rolling(window=w).mean().to_numpy() for w in (w1, w2, w3))
+
+
+def ema3(close, a1, a2, a3):
+    """Three exponential moving averages (adjust=False)"""
+    close = pd.Series(close)
+    return tuple(close.ewm(alpha=a, adjust=False).mean().to_numpy() for a in (a1, a2, a3))
+
+
+def last_true(mask, k):
+    """Positions of the last k True entries of mask in ascending order"""
+    return np.flatnonzero(mask)[-k:] if k > 0 else np.empty(0, dtype=np.int64)
@@ -1,13 +1,62 @@
 import pandas as pd
 import numpy as np
+from kernels import sma3, ema3
+
+# Weights of the market structure votes (adjust weights as needed)
+_STRUCTURE_WEIGHTS = (
+    0.3,  # Short-term trend (fast vs slow MA)
+    0.3,  # Long-term trend (slow vs long MA)
+    0.4,  # Price vs Long-term MA
+)
+
+def _market_structure(weighted_score):
+    """Determine market structure based on weighted score"""
+    if weighted_score > 0.5:
+        return {
+            'signal': 'STRONG_BULLISH',
+            'description': 'Strong bullish alignment with weighted score > 0.5'
+        }
+    elif weighted_score < -0.5:
+        return {
+            'signal': 'STRONG_BEARISH',
+            'description': 'Strong bearish alignment with weighted score < -0.5'
+        }
+    elif weighted_score > 0:
+        return {
+            'signal': 'BULLISH_BIAS',
+            'description': f'Bullish bias with weighted score: {weighted_score:.2f}'
+        }
+    else:
+        return {
+            'signal': 'BEARISH_BIAS',
+            'description': f'Bearish bias with weighted score: {weighted_score:.2f}'
+        }
+
+# Market structure for each 3-bit vote mask (bit 2: fast > slow, bit 1: slow > long, bit 0: price > long)
+_STRUCTURE_LUT = tuple(
+    _market_structure(
+        _STRUCTURE_WEIGHTS[0] * (1 if mask & 4 else -1) +
+        _STRUCTURE_WEIGHTS[1] * (1 if mask & 2 else -1) +
+        _STRUCTURE_WEIGHTS[2] * (1 if mask & 1 else -1)
+    )
+    for mask in range(8)
+)
+
+# Price position signal and description template, indexed by (above both << 1) | below both
+_PRICE_POSITION_LUT = (
+    ('BETWEEN', 'Price ${price:.2f} between MAs'),
+    ('BELOW_BOTH', 'Price ${price:.2f} below both MAs'),
+    ('ABOVE_BOTH', 'Price ${price:.2f} above both MAs'),
+)
 
 class MACross:
-    def __init__(self, df, fast_periods=[10, 50], slow_periods=[50, 200], ma_type='SMA'):
+    def __init__(self, df, fast_periods=[10, 50], slow_periods=[50, 200], ma_type='SMA', averages=None):
         """
         Initialize MA Cross indicator
         fast_periods: list of fast MA periods [10, 50]
         slow_periods: list of slow MA periods [50, 200]
         ma_type: 'SMA' or 'EMA'
+        averages: optional precomputed (fast, slow, long) arrays, e.g. from IndicatorEngine.run
         """
         self.df = df
         self.fast_ma_period = fast_periods[0]  # e.g., 10
@@ -15,26 +64,33 @@ class MACross:
         self.long_ma_period = slow_periods[1] # e.g., 200
         self.ma_type = ma_type
         
+        # Raw close array, read once and reused by calculate()
+        self._close = np.ascontiguousarray(df['close'], dtype=np.float64)
+        
         # Calculate all MAs
-        self.calculate()
+        self.calculate(averages)
     
-    def calculate(self):
-        """Calculate all moving averages"""
-        if self.ma_type == 'SMA':
-            self.ma_fast = self.df['close'].rolling(window=self.fast_ma_period).mean()
-            self.ma_slow = self.df['close'].rolling(window=self.slow_ma_period).mean()
-            self.ma_long = self.df['close'].rolling(window=self.long_ma_period).mean()
+    def calculate(self, averages=None):
+        """Calculate all moving averages in a single pass over close"""
+        periods = (self.fast_ma_period, self.slow_ma_period, self.long_ma_period)
+        if averages is not None:
+            self._ma_fast, self._ma_slow, self._ma_long = averages
+        elif self.ma_type == 'SMA':
+            self._ma_fast, self._ma_slow, self._ma_long = sma3(self._close, *periods)
         else:  # EMA
-            self.ma_fast = self.df['close'].ewm(span=self.fast_ma_period, adjust=False).mean()
-            self.ma_slow = self.df['close'].ewm(span=self.slow_ma_period, adjust=False).mean()
-            self.ma_long = self.df['close'].ewm(span=self.long_ma_period, adjust=False).mean()
+            alphas = (2.0 / (period + 1) for period in periods)
+            self._ma_fast, self._ma_slow, self._ma_long = ema3(self._close, *alphas)
+        
+        self.ma_fast = pd.Series(self._ma_fast, index=self.df.index)
+        self.ma_slow = pd.Series(self._ma_slow, index=self.df.index)
+        self.ma_long = pd.Series(self._ma_long, index=self.df.index)
     
     def get_current_values(self):
         """Get current MA values"""
         return {
-            'ma_fast': self.ma_fast.iloc[-1],
-            'ma_slow': self.ma_slow.iloc[-1],
-            'ma_long': self.ma_long.iloc[-1]
+            'ma_fast': self._ma_fast[-1],
+            'ma_slow': self._ma_slow[-1],
+            'ma_long': self._ma_long[-1]
         }
     
     def analyze(self, current_price):
@@ -82,21 +138,13 @@ class MACross:
             }
         
         # 2. Price Position relative to MAs
-        if price > fast_ma and price > slow_ma:
-            result['price_position'] = {
-                'signal': 'ABOVE_BOTH',
-                'description': f'Price ${price:.2f} above both MAs'
-            }
-        elif price < fast_ma and price < slow_ma:
-            result['price_position'] = {
-                'signal': 'BELOW_BOTH',
-                'description': f'Price ${price:.2f} below both MAs'
-            }
-        else:
-            result['price_position'] = {
-                'signal': 'BETWEEN',
-                'description': f'Price ${price:.2f} between MAs'
-            }
+        # Bit 1: above both, bit 0: below both (never both set)
+        position = (int(price > fast_ma and price > slow_ma) << 1) | int(price < fast_ma and price < slow_ma)
+        signal, description = _PRICE_POSITION_LUT[position]
+        result['price_position'] = {
+            'signal': signal,
+            'description': description.format(price=price)
+        }
         
         # 3. Distance from MAs
         fast_distance = ((price - fast_ma) / price) * 100
@@ -117,71 +165,35 @@ class MACross:
         ma_slow_long_diff = ((values['ma_slow'] - values['ma_long']) / values['ma_long']) * 100
         price_ma_long_diff = ((price - values['ma_long']) / values['ma_long']) * 100
 
-        # Assign weights to each signal (adjust weights as needed)
-        weights = {
-            'ma_fast_slow': 0.3,  # Short-term trend
-            'ma_slow_long': 0.3,  # Long-term trend
-            'price_ma_long': 0.4  # Price vs Long-term MA
-        }
-
-        # Calculate weighted score
-        weighted_score = (
-            weights['ma_fast_slow'] * (1 if ma_fast_slow_diff > 0 else -1) +
-            weights['ma_slow_long'] * (1 if ma_slow_long_diff > 0 else -1) +
-            weights['price_ma_long'] * (1 if price_ma_long_diff > 0 else -1)
-        )
-
-        # Determine market structure based on weighted score
-        if weighted_score > 0.5:
-            return {
-                'signal': 'STRONG_BULLISH',
-                'description': 'Strong bullish alignment with weighted score > 0.5'
-            }
-        elif weighted_score < -0.5:
-            return {
-                'signal': 'STRONG_BEARISH',
-                'description': 'Strong bearish alignment with weighted score < -0.5'
-            }
-        elif weighted_score > 0:
-            return {
-                'signal': 'BULLISH_BIAS',
-                'description': f'Bullish bias with weighted score: {weighted_score:.2f}'
-            }
-        else:
-            return {
-                'signal': 'BEARISH_BIAS',
-                'description': f'Bearish bias with weighted score: {weighted_score:.2f}'
-            }
+        # Pack the three votes into a 3-bit mask and look up the precomputed result
+        mask = (int(ma_fast_slow_diff > 0) << 2) | (int(ma_slow_long_diff > 0) << 1) | int(price_ma_long_diff > 0)
+        return dict(_STRUCTURE_LUT[mask])
     
     def get_cross_history(self, lookback=10):
         """Get recent MA cross events"""
         crosses = {}
         
         # Check short-term crosses (e.g., 10/50)
-        ma_fast_above = self.ma_fast > self.ma_slow
-        crosses_fast_slow = ma_fast_above.diff()
-        recent_crosses_fast_slow = crosses_fast_slow.iloc[-lookback:]
+        crosses[f'{self.fast_ma_period}_{self.slow_ma_period}'] = self._last_crosses(self._ma_fast, self._ma_slow, lookback)
         
         # Check long-term crosses (e.g., 50/200)
-        ma_slow_above = self.ma_slow > self.ma_long
-        crosses_slow_long = ma_slow_above.diff()
-        recent_crosses_slow_long = crosses_slow_long.iloc[-lookback:]
-        
-        # Find golden/death crosses
-        golden_cross_fast_slow = recent_crosses_fast_slow[recent_crosses_fast_slow == 1]
-        death_cross_fast_slow = recent_crosses_fast_slow[recent_crosses_fast_slow == -1]
-        
-        golden_cross_slow_long = recent_crosses_slow_long[recent_crosses_slow_long == 1]
-        death_cross_slow_long = recent_crosses_slow_long[recent_crosses_slow_long == -1]
+        crosses[f'{self.slow_ma_period}_{self.long_ma_period}'] = self._last_crosses(self._ma_slow, self._ma_long, lookback)
         
-        crosses[f'{self.fast_ma_period}_{self.slow_ma_period}'] = {
-            'last_golden_cross': golden_cross_fast_slow.index[-1] if not golden_cross_fast_slow.empty else None,
-            'last_death_cross': death_cross_fast_slow.index[-1] if not death_cross_fast_slow.empty else None
-        }
+        return crosses
+    
+    def _last_crosses(self, fast_ma, slow_ma, lookback):
+        """Find the last golden/death cross of fast_ma over slow_ma within the lookback window"""
+        # +1 where fast moves above slow (golden), -1 where it moves below (death)
+        above = (fast_ma > slow_ma).astype(np.int8)
+        delta = np.zeros_like(above)
+        delta[1:] = above[1:] - above[:-1]
+        
+        start = max(len(delta) - lookback, 0)
+        recent = delta[start:]
+        golden = np.flatnonzero(recent == 1)
+        death = np.flatnonzero(recent == -1)
         
-        crosses[f'{self.slow_ma_period}_{self.long_ma_period}'] = {
-            'last_golden_cross': golden_cross_slow_long.index[-1] if not golden_cross_slow_long.empty else None,
-            'last_death_cross': death_cross_slow_long.index[-1] if not death_cross_slow_long.empty else None
+        return {
+            'last_golden_cross': self.df.index[start + golden[-1]] if golden.size else None,
+            'last_death_cross': self.df.index[start + death[-1]] if death.size else None
         }
-        
-        return crosses
\ No newline at end of file
@@ -1,185 +1,193 @@
+import sys
 import ccxt
+from concurrent.futures import ThreadPoolExecutor
 import pandas as pd
 from ichimoku import Ichimoku
 from rsi import RSI
 from fractals import WilliamsFractals
 from ma_cross import MACross
+from engine import IndicatorEngine
 import numpy as np
 
-def get_color_code(signal):
-    """Return color code based on signal"""
-    colors = {
-        'BULLISH': '\033[92m',  # Green
-        'BEARISH': '\033[91m',  # Red
-        'NEUTRAL': '\033[93m',  # Yellow
-        'OVERBOUGHT': '\033[91m',  # Red
-        'OVERSOLD': '\033[92m',  # Green
-        'RISING': '\033[92m',  # Green
-        'FALLING': '\033[91m',  # Red
-        'BREAKOUT': '\033[92m',  # Green
-        'BREAKDOWN': '\033[91m',  # Red
-        'RANGE': '\033[93m',  # Yellow
-        'UPTREND': '\033[92m',  # Green
-        'DOWNTREND': '\033[91m',  # Red
-        'MIXED': '\033[93m',  # Yellow
-        'ABOVE_BOTH': '\033[92m',  # Green
-        'BELOW_BOTH': '\033[91m',  # Red
-        'BETWEEN': '\033[93m',  # Yellow
-        'STRONG_BULLISH': '\033[92m',  # Green
-        'STRONG_BEARISH': '\033[91m',  # Red
-        'BULLISH_BIAS': '\033[92m',  # Green
-        'BEARISH_BIAS': '\033[91m',  # Red
-    }
-    return colors.get(signal, '')
+# Color code for each signal
+_COLORS = {
+    'BULLISH': '\033[92m',  # Green
+    'BEARISH': '\033[91m',  # Red
+    'NEUTRAL': '\033[93m',  # Yellow
+    'OVERBOUGHT': '\033[91m',  # Red
+    'OVERSOLD': '\033[92m',  # Green
+    'RISING': '\033[92m',  # Green
+    'FALLING': '\033[91m',  # Red
+    'BREAKOUT': '\033[92m',  # Green
+    'BREAKDOWN': '\033[91m',  # Red
+    'RANGE': '\033[93m',  # Yellow
+    'UPTREND': '\033[92m',  # Green
+    'DOWNTREND': '\033[91m',  # Red
+    'MIXED': '\033[93m',  # Yellow
+    'ABOVE_BOTH': '\033[92m',  # Green
+    'BELOW_BOTH': '\033[91m',  # Red
+    'BETWEEN': '\033[93m',  # Yellow
+    'STRONG_BULLISH': '\033[92m',  # Green
+    'STRONG_BEARISH': '\033[91m',  # Red
+    'BULLISH_BIAS': '\033[92m',  # Green
+    'BEARISH_BIAS': '\033[91m',  # Red
+}
+
+# Fully formatted, color-coded label for each signal
+_SIGNAL_LABELS = {signal: f'{color}{signal}\033[0m' for signal, color in _COLORS.items()}
+
+def format_signal(signal):
+    """Return the color-coded label for a signal"""
+    label = _SIGNAL_LABELS.get(signal)
+    return label if label is not None else f'{signal}\033[0m'
 
 def print_ichimoku_analysis(symbol, current_price, values, analysis):
     """Print formatted Ichimoku analysis"""
-    print(f"\n{'='*50}")
-    print(f"{symbol} ICHIMOKU ANALYSIS")
-    print(f"{'='*50}")
-    print(f"Price: ${current_price:.2f}")
-    print(f"Tenkan: ${values['tenkan']:.2f}")
-    print(f"Kijun: ${values['kijun']:.2f}")
-    print(f"\nCurrent Cloud (at price):")
-    print(f"Span A: ${values['current_span_a']:.2f}")
-    print(f"Span B: ${values['current_span_b']:.2f}")
-    print(f"\nFuture Cloud (30 periods ahead):")
-    print(f"Span A: ${values['future_span_a']:.2f}")
-    print(f"Span B: ${values['future_span_b']:.2f}")
-    
-    print("\n--- Ichimoku Signals ---")
+    parts = []
+    parts.append(f"\n{'='*50}")
+    parts.append(f"{symbol} ICHIMOKU ANALYSIS")
+    parts.append(f"{'='*50}")
+    parts.append(f"Price: ${current_price:.2f}")
+    parts.append(f"Tenkan: ${values['tenkan']:.2f}")
+    parts.append(f"Kijun: ${values['kijun']:.2f}")
+    parts.append(f"\nCurrent Cloud (at price):")
+    parts.append(f"Span A: ${values['current_span_a']:.2f}")
+    parts.append(f"Span B: ${values['current_span_b']:.2f}")
+    parts.append(f"\nFuture Cloud (30 periods ahead):")
+    parts.append(f"Span A: ${values['future_span_a']:.2f}")
+    parts.append(f"Span B: ${values['future_span_b']:.2f}")
+    
+    parts.append("\n--- Ichimoku Signals ---")
     
     # 1. Price vs Cloud
     price_signal = analysis['price_vs_cloud']
-    color = get_color_code(price_signal['signal'])
-    print(f"1. Price vs Cloud: {color}{price_signal['signal']}\033[0m ({price_signal['description']})")
+    parts.append(f"1. Price vs Cloud: {format_signal(price_signal['signal'])} ({price_signal['description']})")
     
     # 2. Future Cloud
     future_signal = analysis['future_cloud']
-    color = get_color_code(future_signal['signal'])
-    print(f"2. Future cloud: {color}{future_signal['signal']}\033[0m ({future_signal['description']})")
+    parts.append(f"2. Future cloud: {format_signal(future_signal['signal'])} ({future_signal['description']})")
     
     # 3. TK Cross
     tk_signal = analysis['tk_cross']
-    color = get_color_code(tk_signal['signal'])
-    print(f"3. TK Cross: {color}{tk_signal['signal']}\033[0m ({tk_signal['description']})")
+    parts.append(f"3. TK Cross: {format_signal(tk_signal['signal'])} ({tk_signal['description']})")
+    
+    sys.stdout.write("\n".join(parts) + "\n")
 
 def print_rsi_analysis(symbol, values, analysis, rsi):
     """Print formatted RSI analysis"""
-    print(f"\n{'='*50}")
-    print(f"{symbol} RSI ANALYSIS")
-    print(f"{'='*50}")
-    print(f"RSI: {values['rsi']:.2f}")
-    print(f"Smoothed RSI (SMA): {values['smoothed_rsi']:.2f}")
-    print(f"Levels: {values['lower_limit']}/{values['middle_limit']}/{values['upper_limit']}")
+    parts = []
+    parts.append(f"\n{'='*50}")
+    parts.append(f"{symbol} RSI ANALYSIS")
+    parts.append(f"{'='*50}")
+    parts.append(f"RSI: {values['rsi']:.2f}")
+    parts.append(f"Smoothed RSI (SMA): {values['smoothed_rsi']:.2f}")
+    parts.append(f"Levels: {values['lower_limit']}/{values['middle_limit']}/{values['upper_limit']}")
     
-    print("\n--- RSI Signals ---")
+    parts.append("\n--- RSI Signals ---")
     
     # 1. Condition
     condition = analysis['condition']
-    color = get_color_code(condition['signal'])
-    print(f"1. Condition: {color}{condition['signal']}\033[0m ({condition['description']})")
+    parts.append(f"1. Condition: {format_signal(condition['signal'])} ({condition['description']})")
     
     # 2. Momentum
     momentum = analysis['momentum']
-    color = get_color_code(momentum['signal'])
-    print(f"2. Momentum: {color}{momentum['signal']}\033[0m ({momentum['description']})")
+    parts.append(f"2. Momentum: {format_signal(momentum['signal'])} ({momentum['description']})")
     
     # 3. Trend
     if 'trend' in analysis:
         trend = analysis['trend']
-        color = get_color_code(trend['signal'])
-        print(f"3. RSI Trend: {color}{trend['signal']}\033[0m ({trend['description']})")
+        parts.append(f"3. RSI Trend: {format_signal(trend['signal'])} ({trend['description']})")
     
     # Check for RSI divergence
     divergence = rsi.get_divergence()
     if divergence:
-        print(f"\n--- RSI Divergence Check ---")
+        parts.append(f"\n--- RSI Divergence Check ---")
         if divergence['bullish_divergence']:
-            print(f"\033[92mBULLISH DIVERGENCE\033[0m: {divergence['description']}")
+            parts.append(f"\033[92mBULLISH DIVERGENCE\033[0m: {divergence['description']}")
         elif divergence['bearish_divergence']:
-            print(f"\033[91mBEARISH DIVERGENCE\033[0m: {divergence['description']}")
+            parts.append(f"\033[91mBEARISH DIVERGENCE\033[0m: {divergence['description']}")
         else:
-            print(f"No divergence: {divergence['description']}")
+            parts.append(f"No divergence: {divergence['description']}")
+    
+    sys.stdout.write("\n".join(parts) + "\n")
 
 def print_fractals_analysis(symbol, current_price, values, analysis):
     """Print formatted Williams Fractals analysis"""
-    print(f"\n{'='*50}")
-    print(f"{symbol} WILLIAMS FRACTALS ANALYSIS")
-    print(f"{'='*50}")
+    parts = []
+    parts.append(f"\n{'='*50}")
+    parts.append(f"{symbol} WILLIAMS FRACTALS ANALYSIS")
+    parts.append(f"{'='*50}")
     if values['last_up_fractal']:
-        print(f"Last Resistance (Up Fractal): ${values['last_up_fractal']:.2f}")
+        parts.append(f"Last Resistance (Up Fractal): ${values['last_up_fractal']:.2f}")
     if values['last_down_fractal']:
-        print(f"Last Support (Down Fractal): ${values['last_down_fractal']:.2f}")
-    print(f"Recent Fractals Count - Up: {values['up_fractal_count']}, Down: {values['down_fractal_count']}")
+        parts.append(f"Last Support (Down Fractal): ${values['last_down_fractal']:.2f}")
+    parts.append(f"Recent Fractals Count - Up: {values['up_fractal_count']}, Down: {values['down_fractal_count']}")
     
-    print("\n--- Fractal Signals ---")
+    parts.append("\n--- Fractal Signals ---")
     
     # 1. Position
     if 'position' in analysis:
         position = analysis['position']
-        color = get_color_code(position['signal'])
-        print(f"1. Price Position: {color}{position['signal']}\033[0m ({position['description']})")
+        parts.append(f"1. Price Position: {format_signal(position['signal'])} ({position['description']})")
     
     # 2. Fractal Trend
     if 'fractal_trend' in analysis:
         trend = analysis['fractal_trend']
-        color = get_color_code(trend['signal'])
-        print(f"2. Fractal Trend: {color}{trend['signal']}\033[0m ({trend['description']})")
+        parts.append(f"2. Fractal Trend: {format_signal(trend['signal'])} ({trend['description']})")
     
     # 3. Distances
     if 'distances' in analysis:
         distances = analysis['distances']
-        print(f"3. Distances: {distances['description']}")
+        parts.append(f"3. Distances: {distances['description']}")
 
     # 4. Recent Fractal Sequence and Dominance
     if 'recent_fractal_sequence' in analysis:
         seq_info = analysis['recent_fractal_sequence']
-        print(f"4. {seq_info['description']}")
+        parts.append(f"4. {seq_info['description']}")
+    
+    sys.stdout.write("\n".join(parts) + "\n")
 
 def print_ma_cross_analysis(symbol, current_price, values, analysis):
     """Print formatted MA Cross analysis"""
-    print(f"\n{'='*50}")
-    print(f"{symbol} MOVING AVERAGE CROSS ANALYSIS")
-    print(f"{'='*50}")
-    print(f"SMA Values:")
-    print(f"MA10: ${values['ma_fast']:.2f}, MA50: ${values['ma_slow']:.2f}, MA200: ${values['ma_long']:.2f}")
+    parts = []
+    parts.append(f"\n{'='*50}")
+    parts.append(f"{symbol} MOVING AVERAGE CROSS ANALYSIS")
+    parts.append(f"{'='*50}")
+    parts.append(f"SMA Values:")
+    parts.append(f"MA10: ${values['ma_fast']:.2f}, MA50: ${values['ma_slow']:.2f}, MA200: ${values['ma_long']:.2f}")
     
     # Set 1: Short-term (10/50) Analysis
-    print(f"\n--- MA Set 1 (10/50) ---")
+    parts.append(f"\n--- MA Set 1 (10/50) ---")
     set1 = analysis['set1_short_term']
     
     # Cross status
-    cross_color = get_color_code(set1['cross_status']['signal'])
-    print(f"1. Cross Status: {cross_color}{set1['cross_status']['signal']}\033[0m ({set1['cross_status']['description']})")
+    parts.append(f"1. Cross Status: {format_signal(set1['cross_status']['signal'])} ({set1['cross_status']['description']})")
     
     # Price position
-    pos_color = get_color_code(set1['price_position']['signal'])
-    print(f"2. Price Position: {pos_color}{set1['price_position']['signal']}\033[0m ({set1['price_position']['description']})")
+    parts.append(f"2. Price Position: {format_signal(set1['price_position']['signal'])} ({set1['price_position']['description']})")
     
     # Distances
-    print(f"3. {set1['distances']['description']}")
+    parts.append(f"3. {set1['distances']['description']}")
     
     # Set 2: Long-term (50/200) Analysis
-    print(f"\n--- MA Set 2 (50/200) ---")
+    parts.append(f"\n--- MA Set 2 (50/200) ---")
     set2 = analysis['set2_long_term']
     
     # Cross status
-    cross_color = get_color_code(set2['cross_status']['signal'])
-    print(f"1. Cross Status: {cross_color}{set2['cross_status']['signal']}\033[0m ({set2['cross_status']['description']})")
+    parts.append(f"1. Cross Status: {format_signal(set2['cross_status']['signal'])} ({set2['cross_status']['description']})")
     
     # Price position
-    pos_color = get_color_code(set2['price_position']['signal'])
-    print(f"2. Price Position: {pos_color}{set2['price_position']['signal']}\033[0m ({set2['price_position']['description']})")
+    parts.append(f"2. Price Position: {format_signal(set2['price_position']['signal'])} ({set2['price_position']['description']})")
     
     # Distances
-    print(f"3. {set2['distances']['description']}")
+    parts.append(f"3. {set2['distances']['description']}")
     
     # Market Structure
-    print(f"\n--- Overall Market Structure ---")
+    parts.append(f"\n--- Overall Market Structure ---")
     structure = analysis['market_structure']
-    struct_color = get_color_code(structure['signal'])
-    print(f"{struct_color}{structure['signal']}\033[0m: {structure['description']}")
+    parts.append(f"{format_signal(structure['signal'])}: {structure['description']}")
+    
+    sys.stdout.write("\n".join(parts) + "\n")
 
 def main():
     # Initialize exchange
@@ -190,28 +198,49 @@ def main():
     timeframe = '1d'
     limit = 500
     
-    # Get ticker for most recent price
-    ticker = exchange.fetch_ticker(symbol)
+    # Load markets once up front; both fetches would otherwise trigger it concurrently (it is not locked)
+    exchange.load_markets()
+    
+    # Get ticker for most recent price and OHLCV data concurrently
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        ticker_future = executor.submit(exchange.fetch_ticker, symbol)
+        ohlcv_future = executor.submit(exchange.fetch_ohlcv, symbol, timeframe, limit=limit)
+        ticker = ticker_future.result()
+        ohlcv = ohlcv_future.result()
     current_price = ticker['last']
     
-    # Get OHLCV data
-    ohlcv = exchange.fetch_ohlcv(symbol, timeframe, limit=limit)
-    df = pd.DataFrame(ohlcv, columns=['timestamp', 'open', 'high', 'low', 'close', 'volume'])
+    # Build the DataFrame from typed columns of one float64 array
+    data = np.asarray(ohlcv, dtype=np.float64)
+    df = pd.DataFrame({
+        'timestamp': data[:, 0].astype(np.int64),
+        'open': data[:, 1],
+        'high': data[:, 2],
+        'low': data[:, 3],
+        'close': data[:, 4],
+        'volume': data[:, 5],
+    }, copy=False)
+    
+    # Indicators only read high/low/close, so hand them a lean frame
+    df_ind = df[['high', 'low', 'close']]
+    
+    # Ichimoku lines and SMAs in one pass over the shared price buffer
+    engine = IndicatorEngine(limit)
+    lines = engine.run(data[:, 2], data[:, 3], data[:, 4])
     
     # Initialize and analyze Ichimoku
-    ichimoku = Ichimoku(df)
+    ichimoku = Ichimoku(df_ind, lines=(lines['tenkan'], lines['kijun'], lines['senkou_span_a'], lines['senkou_span_b']))
     ichimoku_values, ichimoku_analysis = ichimoku.analyze(current_price)
     
     # Initialize and analyze RSI
-    rsi = RSI(df, length=14, smoothing_type='SMA', smoothing_length=14)
+    rsi = RSI(df_ind, length=14, smoothing_type='SMA', smoothing_length=14)
     rsi_values, rsi_analysis = rsi.analyze()
     
     # Initialize and analyze Williams Fractals
-    fractals = WilliamsFractals(df)
+    fractals = WilliamsFractals(df_ind)
     fractals_values, fractals_analysis = fractals.analyze(current_price)
     
     # Initialize and analyze MA Cross
-    ma_cross = MACross(df, fast_periods=[10, 50], slow_periods=[50, 200], ma_type='SMA')
+    ma_cross = MACross(df_ind, fast_periods=[10, 50], slow_periods=[50, 200], ma_type='SMA', averages=(lines['ma_fast'], lines['ma_slow'], lines['ma_long']))
     ma_values, ma_analysis = ma_cross.analyze(current_price)
     
     # Print results
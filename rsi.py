@@ -1,5 +1,104 @@
 import pandas as pd
 import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+from kernels import COMPILED, wilder_rsi, wilder_rsi_2d
+
+try:
+    import bottleneck as bn
+    _HAS_BN = True
+except ImportError:  # bottleneck is optional, the NumPy versions below are used without it
+    _HAS_BN = False
+
+try:
+    import numexpr as ne
+    _HAS_NE = True
+except ImportError:  # numexpr is optional, plain NumPy evaluates the RSI expression without it
+    _HAS_NE = False
+
+# Below this many bars NumPy's temporaries stay in cache and numexpr's call overhead makes it slower
+_NE_MIN_SIZE = 250_000
+
+def _description(describe, fmt, *args):
+    """fmt formatted with args, or None when only the signals were asked for"""
+    return fmt.format(*args) if describe else None
+
+def _rsi_from_averages(avg_gains, avg_losses):
+    """
+    100 - 100 / (1 + RS) from the smoothed gains and losses
+    Where the average loss is 0 the RSI is set directly: 100 after any gain, NaN on a flat series
+    """
+    if _HAS_NE and avg_gains.size >= _NE_MIN_SIZE:
+        # One fused pass, no temporaries for the intermediate steps
+        rsi = ne.evaluate("100.0 - 100.0 / (1.0 + ag / al)", local_dict={'ag': avg_gains, 'al': avg_losses})
+    else:
+        with np.errstate(divide='ignore', invalid='ignore'):
+            rsi = 100.0 - 100.0 / (1.0 + avg_gains / avg_losses)
+    no_loss = avg_losses == 0.0
+    rsi[no_loss] = np.where(avg_gains[no_loss] > 0.0, 100.0, np.nan)
+    return rsi
+
+def _peaks_and_troughs(values, window):
+    """
+    Masks of the values equal to the max/min of the centered window around them
+    Matches rolling(window, center=True): edges without a full window are never peaks or troughs
+    """
+    is_peak = np.zeros(len(values), dtype=bool)
+    is_trough = np.zeros(len(values), dtype=bool)
+    if len(values) < window:
+        return is_peak, is_trough
+    
+    if _HAS_BN:
+        # Trailing window maxima/minima; the first complete one ends at window - 1
+        highs = bn.move_max(values, window)[window - 1:]
+        lows = bn.move_min(values, window)[window - 1:]
+    else:
+        windows = sliding_window_view(values, window)
+        highs = windows.max(axis=1)
+        lows = windows.min(axis=1)
+    half = window // 2
+    center = values[half:half + len(highs)]
+    is_peak[half:half + len(highs)] = highs == center
+    is_trough[half:half + len(highs)] = lows == center
+    return is_peak, is_trough
+
+def _rolling_mean(values, window):
+    """
+    Rolling mean from one cumulative sum, O(n) regardless of the window
+    Like rolling(window).mean(): NaN until the window is full and wherever it holds a NaN
+    """
+    out = np.full(len(values), np.nan)
+    if window < 1 or len(values) < window:
+        return out
+    if _HAS_BN:
+        return bn.move_mean(values, window, min_count=window)
+    
+    missing = np.isnan(values)
+    csum = np.concatenate(([0.0], np.cumsum(np.where(missing, 0.0, values))))
+    cnan = np.concatenate(([0], np.cumsum(missing)))
+    out[window - 1:] = (csum[window:] - csum[:-window]) / window
+    out[window - 1:][cnan[window:] - cnan[:-window] > 0] = np.nan
+    return out
+
+def _next_label(tail, position):
+    """Index label after the last two in tail, continuing their step; the position if that is not possible"""
+    try:
+        if len(tail) == 2:
+            return tail[1] + (tail[1] - tail[0])
+        if len(tail) == 1:
+            return tail[0] + 1
+    except TypeError:
+        pass
+    return position
+
+def _nearest(positions, target):
+    """Element of the sorted positions closest to target, preferring the later one on ties"""
+    j = np.searchsorted(positions, target)
+    if j == 0:
+        return positions[0]
+    if j == len(positions):
+        return positions[-1]
+    before, after = positions[j - 1], positions[j]
+    return before if target - before < after - target else after
 
 class RSI:
     def __init__(self, df, length=14, smoothing_type='SMA', smoothing_length=14, 
@@ -12,46 +111,183 @@ class RSI:
         self.middle_limit = middle_limit
         self.lower_limit = lower_limit
         
+        # Flat float64 close prices, shared by calculate() and get_divergence()
+        self._close = np.ascontiguousarray(self.df['close'].to_numpy(dtype=np.float64))
+        
+        # Index labels of the bars added by update(), None where the default is derived later
+        self._labels = []
+        
         # Calculate RSI
         self.calculate()
     
     def calculate(self):
         """Calculate RSI using Wilder's Smoothing (standard EMA-based method)"""
-        delta = self.df['close'].diff()
+        close = self._close
+        if COMPILED:
+            # Single fused pass over close
+            self._rsi_arr, avg_gain, avg_loss = wilder_rsi(close, self.length)
+        else:
+            # Without compiled kernels keep the element-wise work in NumPy and the recurrences in pandas ewm
+            delta = np.zeros_like(close)
+            np.subtract(close[1:], close[:-1], out=delta[1:])
+            # A change next to a NaN close counts as neither gain nor loss, as in the compiled kernel
+            delta[np.isnan(delta)] = 0.0
+            
+            # Branchless split: gain = (|d| + d) / 2, loss = (|d| - d) / 2
+            magnitude = np.abs(delta)
+            gains = (magnitude + delta) * 0.5
+            losses = (magnitude - delta) * 0.5
+            
+            # Use EMA (Wilder's smoothing)
+            avg_gains = pd.Series(gains).ewm(alpha=1.0 / self.length, adjust=False).mean().to_numpy()
+            avg_losses = pd.Series(losses).ewm(alpha=1.0 / self.length, adjust=False).mean().to_numpy()
+            
+            # Calculate RS and RSI
+            self._rsi_arr = _rsi_from_averages(avg_gains, avg_losses)
+            avg_gain = avg_gains[-1] if len(close) else 0.0
+            avg_loss = avg_losses[-1] if len(close) else 0.0
+        
+        # Wilder state (avg gain, avg loss, last close) for update(); it moves the arrays to a growable buffer
+        self._state = (float(avg_gain), float(avg_loss), float(close[-1]) if len(close) else np.nan)
+        self._buf = None
+        
+        # Apply smoothing if needed; without it the smoothed RSI shares the RSI buffer
+        if not self._smoothing():
+            self._smoothed_arr = self._rsi_arr
+        elif self.smoothing_type == 'SMA':
+            self._smoothed_arr = _rolling_mean(self._rsi_arr, self.smoothing_length)
+        else:
+            self._smoothed_arr = pd.Series(self._rsi_arr).ewm(span=self.smoothing_length, adjust=False).mean().to_numpy()
+    
+    def _smoothing(self):
+        """False when smoothing is the identity: no SMA/EMA type, or a length of 1 (or less)"""
+        return self.smoothing_type in ('SMA', 'EMA') and self.smoothing_length > 1
+    
+    @classmethod
+    def batch(cls, closes, length=14):
+        """
+        Unsmoothed RSI for many symbols in one call
+        closes: (time, symbol) array of close prices; returns an array of the same shape
+        """
+        closes = np.ascontiguousarray(closes, dtype=np.float64)
+        if COMPILED:
+            return wilder_rsi_2d(closes, length)
         
-        gains = delta.where(delta > 0, 0)
-        losses = -delta.where(delta < 0, 0)
+        # Same steps as calculate(), with the recurrences stepping over all symbols at once
+        delta = np.zeros_like(closes)
+        np.subtract(closes[1:], closes[:-1], out=delta[1:])
+        delta[np.isnan(delta)] = 0.0
+        magnitude = np.abs(delta)
+        gains = (magnitude + delta) * 0.5
+        losses = (magnitude - delta) * 0.5
         
-        # Use EMA (Wilder's smoothing)
-        avg_gains = gains.ewm(alpha=1/self.length, adjust=False).mean()
-        avg_losses = losses.ewm(alpha=1/self.length, adjust=False).mean()
+        alpha = 1.0 / length
+        for i in range(1, len(closes)):
+            gains[i] = gains[i - 1] + alpha * (gains[i] - gains[i - 1])
+            losses[i] = losses[i - 1] + alpha * (losses[i] - losses[i - 1])
         
-        # Calculate RS and RSI
-        rs = avg_gains / avg_losses
-        self.rsi = 100 - (100 / (1 + rs))
+        return _rsi_from_averages(gains, losses)
+    
+    def update(self, new_close, label=None):
+        """
+        Advance the RSI by one bar in amortized O(1) instead of recalculating the whole history
+        label: index label of the new bar; by default the index continues with its last step,
+        or with positions when it cannot be extended arithmetically
+        Returns the new (rsi, smoothed_rsi)
+        """
+        avg_gain, avg_loss, prev_close = self._state
+        new_close = float(new_close)
         
-        # Apply smoothing if needed
-        if self.smoothing_type == 'SMA':
-            self.smoothed_rsi = self.rsi.rolling(window=self.smoothing_length).mean()
-        elif self.smoothing_type == 'EMA':
-            self.smoothed_rsi = self.rsi.ewm(span=self.smoothing_length, adjust=False).mean()
+        # One step of Wilder's smoothing, same as calculate()
+        alpha = 1.0 / self.length
+        delta = new_close - prev_close if prev_close == prev_close else 0.0
+        avg_gain += alpha * (max(delta, 0.0) - avg_gain)
+        avg_loss += alpha * (max(-delta, 0.0) - avg_loss)
+        self._state = (avg_gain, avg_loss, new_close)
+        
+        if avg_loss == 0.0:
+            rsi = 100.0 if avg_gain > 0.0 else np.nan
         else:
-            self.smoothed_rsi = self.rsi
+            rsi = 100.0 - 100.0 / (1.0 + avg_gain / avg_loss)
+        
+        # Rows close, rsi, smoothed of a buffer that doubles when full; the arrays are views of it
+        n = len(self._rsi_arr)
+        if self._buf is None or self._buf.shape[1] == n:
+            buf = np.empty((3, max(2 * n, 64)))
+            buf[0, :n] = self._close
+            buf[1, :n] = self._rsi_arr
+            buf[2, :n] = self._smoothed_arr
+            self._buf = buf
+        self._buf[0, n] = new_close
+        self._buf[1, n] = rsi
+        self._close = self._buf[0, :n + 1]
+        self._rsi_arr = self._buf[1, :n + 1]
+        
+        # Continue the smoothing from its last value
+        if not self._smoothing():
+            smoothed = rsi
+        elif self.smoothing_type == 'SMA':
+            # Rolling mean: NaN until the window is full or while it still holds a NaN
+            window = self._rsi_arr[-self.smoothing_length:]
+            smoothed = window.mean() if len(window) == self.smoothing_length else np.nan
+        elif self.smoothing_type == 'EMA':
+            prev = self._smoothed_arr[-1] if len(self._smoothed_arr) else np.nan
+            if np.isnan(prev):
+                smoothed = rsi
+            elif np.isnan(rsi):
+                smoothed = prev
+            else:
+                smoothed = prev + 2.0 / (self.smoothing_length + 1) * (rsi - prev)
+        self._buf[2, n] = smoothed
+        self._smoothed_arr = self._buf[2, :n + 1]
+        
+        self._labels.append(label)
+        
+        return rsi, smoothed
+    
+    def _index(self):
+        """DataFrame index, extended with the labels of the bars added by update()"""
+        if not self._labels:
+            return self.df.index
+        
+        # Fill in default labels only now that the index is actually needed
+        tail = list(self.df.index[-2:])
+        labels = []
+        for position, label in enumerate(self._labels, start=len(self.df)):
+            if label is None:
+                label = _next_label(tail, position)
+            labels.append(label)
+            tail = (tail + [label])[-2:]
+        return self.df.index.append(pd.Index(labels))
+    
+    @property
+    def rsi(self):
+        """RSI as a Series on the DataFrame index"""
+        return pd.Series(self._rsi_arr, index=self._index())
+    
+    @property
+    def smoothed_rsi(self):
+        """Smoothed RSI as a Series on the DataFrame index"""
+        return pd.Series(self._smoothed_arr, index=self._index())
     
     def get_current_values(self):
         """Get current RSI values"""
         return {
-            'rsi': self.rsi.iloc[-1],
-            'smoothed_rsi': self.smoothed_rsi.iloc[-1],
+            'rsi': self._rsi_arr[-1],
+            'smoothed_rsi': self._smoothed_arr[-1],
             'upper_limit': self.upper_limit,
             'middle_limit': self.middle_limit,
             'lower_limit': self.lower_limit
         }
     
-    def analyze(self):
-        """Analyze RSI signals"""
+    def analyze(self, describe=True):
+        """Analyze RSI signals; with describe=False the descriptions are skipped (None)"""
         values = self.get_current_values()
-        current_rsi = values['smoothed_rsi']  # Use smoothed RSI for analysis
+        
+        # Plain Python floats for every comparison and format below (smoothed RSI drives the analysis)
+        arr = self._smoothed_arr
+        current_rsi = float(arr[-1])
+        first_of_recent = float(arr[-5]) if len(arr) >= 5 else current_rsi
         
         # Analysis results
         analysis = {}
@@ -60,61 +296,62 @@ class RSI:
         if current_rsi >= self.upper_limit:
             analysis['condition'] = {
                 'signal': 'OVERBOUGHT',
-                'description': f'RSI {current_rsi:.2f} >= {self.upper_limit} (Potential reversal down)'
+                'description': _description(describe, 'RSI {:.2f} >= {} (Potential reversal down)', current_rsi, self.upper_limit)
             }
         elif current_rsi <= self.lower_limit:
             analysis['condition'] = {
                 'signal': 'OVERSOLD',
-                'description': f'RSI {current_rsi:.2f} <= {self.lower_limit} (Potential reversal up)'
+                'description': _description(describe, 'RSI {:.2f} <= {} (Potential reversal up)', current_rsi, self.lower_limit)
             }
         else:
             analysis['condition'] = {
                 'signal': 'NEUTRAL',
-                'description': f'RSI {current_rsi:.2f} between {self.lower_limit}-{self.upper_limit}'
+                'description': _description(describe, 'RSI {:.2f} between {}-{}', current_rsi, self.lower_limit, self.upper_limit)
             }
         
         # 2. Momentum Analysis
         if current_rsi > self.middle_limit:
             analysis['momentum'] = {
                 'signal': 'BULLISH',
-                'description': f'RSI {current_rsi:.2f} > {self.middle_limit} (Upward momentum)'
+                'description': _description(describe, 'RSI {:.2f} > {} (Upward momentum)', current_rsi, self.middle_limit)
             }
         else:
             analysis['momentum'] = {
                 'signal': 'BEARISH',
-                'description': f'RSI {current_rsi:.2f} < {self.middle_limit} (Downward momentum)'
+                'description': _description(describe, 'RSI {:.2f} < {} (Downward momentum)', current_rsi, self.middle_limit)
             }
         
         # 3. RSI Trend (comparing last few values)
-        recent_rsi = self.smoothed_rsi.iloc[-5:]
-        if len(recent_rsi) >= 5:
-            if recent_rsi.iloc[-1] > recent_rsi.iloc[0]:
+        if len(arr) >= 5:
+            if current_rsi > first_of_recent:
                 analysis['trend'] = {
                     'signal': 'RISING',
-                    'description': f'RSI trending up from {recent_rsi.iloc[0]:.2f} to {recent_rsi.iloc[-1]:.2f}'
+                    'description': _description(describe, 'RSI trending up from {:.2f} to {:.2f}', first_of_recent, current_rsi)
                 }
             else:
                 analysis['trend'] = {
                     'signal': 'FALLING',
-                    'description': f'RSI trending down from {recent_rsi.iloc[0]:.2f} to {recent_rsi.iloc[-1]:.2f}'
+                    'description': _description(describe, 'RSI trending down from {:.2f} to {:.2f}', first_of_recent, current_rsi)
                 }
         
         return values, analysis
     
     def get_divergence(self, lookback=30, peak_window=5):
         """Check for RSI divergence with price by comparing recent peaks and troughs."""
-        if len(self.df) < lookback:
+        if len(self._close) < lookback:
             return None
 
-        # Get recent data
-        recent_prices = self.df['close'].iloc[-lookback:]
-        recent_rsi = self.smoothed_rsi.iloc[-lookback:]
+        # Get recent data (includes bars added by update())
+        prices = self._close[-lookback:]
+        rsi_values = self._smoothed_arr[-lookback:]
 
-        # Find peaks (highs) and troughs (lows)
-        price_peaks = recent_prices[recent_prices.rolling(peak_window, center=True).max() == recent_prices].dropna()
-        price_troughs = recent_prices[recent_prices.rolling(peak_window, center=True).min() == recent_prices].dropna()
-        rsi_peaks = recent_rsi[recent_rsi.rolling(peak_window, center=True).max() == recent_rsi].dropna()
-        rsi_troughs = recent_rsi[recent_rsi.rolling(peak_window, center=True).min() == recent_rsi].dropna()
+        # Find peaks (highs) and troughs (lows) as positions within the recent window
+        price_is_peak, price_is_trough = _peaks_and_troughs(prices, peak_window)
+        rsi_is_peak, rsi_is_trough = _peaks_and_troughs(rsi_values, peak_window)
+        price_peaks = np.flatnonzero(price_is_peak)
+        price_troughs = np.flatnonzero(price_is_trough)
+        rsi_peaks = np.flatnonzero(rsi_is_peak)
+        rsi_troughs = np.flatnonzero(rsi_is_trough)
 
         divergence = {
             'bullish_divergence': False,
@@ -124,28 +361,22 @@ class RSI:
 
         # Check for Bearish Divergence (higher highs in price, lower highs in RSI)
         if len(price_peaks) >= 2 and len(rsi_peaks) >= 2:
-            last_price_peak = price_peaks.index[-1]
-            prev_price_peak = price_peaks.index[-2]
-            
             # Find corresponding RSI peaks
-            last_rsi_peak = rsi_peaks[rsi_peaks.index.get_loc(last_price_peak, method='nearest')]
-            prev_rsi_peak = rsi_peaks[rsi_peaks.index.get_loc(prev_price_peak, method='nearest')]
+            last_rsi_peak = rsi_values[_nearest(rsi_peaks, price_peaks[-1])]
+            prev_rsi_peak = rsi_values[_nearest(rsi_peaks, price_peaks[-2])]
 
-            if price_peaks.iloc[-1] > price_peaks.iloc[-2] and last_rsi_peak < prev_rsi_peak:
+            if prices[price_peaks[-1]] > prices[price_peaks[-2]] and last_rsi_peak < prev_rsi_peak:
                 divergence['bearish_divergence'] = True
                 divergence['description'] = 'Bearish divergence: Price making higher highs, RSI making lower highs'
                 return divergence
 
         # Check for Bullish Divergence (lower lows in price, higher lows in RSI)
         if len(price_troughs) >= 2 and len(rsi_troughs) >= 2:
-            last_price_trough = price_troughs.index[-1]
-            prev_price_trough = price_troughs.index[-2]
-
             # Find corresponding RSI troughs
-            last_rsi_trough = rsi_troughs[rsi_troughs.index.get_loc(last_price_trough, method='nearest')]
-            prev_rsi_trough = rsi_troughs[rsi_troughs.index.get_loc(prev_price_trough, method='nearest')]
+            last_rsi_trough = rsi_values[_nearest(rsi_troughs, price_troughs[-1])]
+            prev_rsi_trough = rsi_values[_nearest(rsi_troughs, price_troughs[-2])]
 
-            if price_troughs.iloc[-1] < price_troughs.iloc[-2] and last_rsi_trough > prev_rsi_trough:
+            if prices[price_troughs[-1]] < prices[price_troughs[-2]] and last_rsi_trough > prev_rsi_trough:
                 divergence['bullish_divergence'] = True
                 divergence['description'] = 'Bullish divergence: Price making lower lows, RSI making higher lows'
                 return divergence